@@ -1,36 +1,55 @@
 from django.contrib import admin
 from .models import (
     Supplier, Category, Product, StockTransaction,
-    ProcurementOrder, ProcurementOrderItem, Notification, StockParity
+    ProcurementOrder, ProcurementOrderItem, Notification, StockParity,
+    SupplierEvaluation
 )
 
 
+class ChangelistDeferMixin:
+    """Skip loading large text columns on changelist pages"""
+    changelist_defer = ()
+
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        match = request.resolver_match
+        if self.changelist_defer and match and match.url_name.endswith('_changelist'):
+            queryset = queryset.defer(*self.changelist_defer)
+        return queryset
+
+
 @admin.register(Supplier)
-class SupplierAdmin(admin.ModelAdmin):
+class SupplierAdmin(ChangelistDeferMixin, admin.ModelAdmin):
     list_display = ['name', 'contact_person', 'email', 'rating', 'total_orders', 'is_active']
     list_filter = ['is_active', 'rating']
     search_fields = ['name', 'email', 'contact_person']
+    changelist_defer = ('description', 'address')
 
 
 @admin.register(Category)
-class CategoryAdmin(admin.ModelAdmin):
+class CategoryAdmin(ChangelistDeferMixin, admin.ModelAdmin):
     list_display = ['name', 'parent', 'is_active']
     list_filter = ['is_active']
     search_fields = ['name']
+    changelist_defer = ('description',)
 
 
 @admin.register(Product)
-class ProductAdmin(admin.ModelAdmin):
+class ProductAdmin(ChangelistDeferMixin, admin.ModelAdmin):
     list_display = ['name', 'sku', 'category', 'current_stock', 'reorder_level', 'unit_price', 'is_active']
     list_filter = ['category', 'is_active']
     search_fields = ['name', 'sku']
+    changelist_defer = ('description',)
+    list_select_related = ('category',)
 
 
 @admin.register(StockTransaction)
-class StockTransactionAdmin(admin.ModelAdmin):
+class StockTransactionAdmin(ChangelistDeferMixin, admin.ModelAdmin):
     list_display = ['product', 'transaction_type', 'quantity', 'created_at', 'user']
     list_filter = ['transaction_type', 'created_at']
     search_fields = ['product__name', 'reference_number']
+    changelist_defer = ('notes',)
+    list_select_related = ('product', 'user')
 
 
 class ProcurementOrderItemInline(admin.TabularInline):
@@ -39,23 +58,37 @@ class ProcurementOrderItemInline(admin.TabularInline):
 
 
 @admin.register(ProcurementOrder)
-class ProcurementOrderAdmin(admin.ModelAdmin):
+class ProcurementOrderAdmin(ChangelistDeferMixin, admin.ModelAdmin):
     list_display = ['order_number', 'supplier', 'status', 'order_date', 'total_amount']
     list_filter = ['status', 'order_date']
     search_fields = ['order_number', 'supplier__name']
+    changelist_defer = ('notes',)
+    list_select_related = ('supplier',)
     inlines = [ProcurementOrderItemInline]
 
 
 @admin.register(Notification)
-class NotificationAdmin(admin.ModelAdmin):
+class NotificationAdmin(ChangelistDeferMixin, admin.ModelAdmin):
     list_display = ['title', 'notification_type', 'priority', 'is_read', 'created_at']
     list_filter = ['notification_type', 'priority', 'is_read', 'created_at']
     search_fields = ['title', 'message']
+    changelist_defer = ('message',)
 
 
 @admin.register(StockParity)
-class StockParityAdmin(admin.ModelAdmin):
+class StockParityAdmin(ChangelistDeferMixin, admin.ModelAdmin):
     list_display = ['product', 'expected_quantity', 'actual_quantity', 'discrepancy', 'resolved', 'created_at']
     list_filter = ['resolved', 'created_at']
     search_fields = ['product__name']
+    changelist_defer = ('reason',)
+    list_select_related = ('product',)
+
+
+@admin.register(SupplierEvaluation)
+class SupplierEvaluationAdmin(ChangelistDeferMixin, admin.ModelAdmin):
+    list_display = ['supplier', 'rating', 'evaluated_by', 'created_at']
+    list_filter = ['created_at']
+    search_fields = ['supplier__name', 'notes']
+    changelist_defer = ('notes',)
+    list_select_related = ('supplier', 'evaluated_by')
 
@@ -0,0 +1,37 @@
+# Generated by Django 4.2.7 on 2026-10-15 21:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('erp_app', '0002_alter_notification_notification_type_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['is_read', '-created_at'], name='erp_app_not_is_read_51a76e_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='procurementorder',
+            index=models.Index(fields=['status', 'order_date'], name='erp_app_pro_status_9c1132_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='procurementorder',
+            index=models.Index(fields=['expected_delivery_date', 'status'], name='erp_app_pro_expecte_597f6f_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['current_stock', 'reorder_level'], name='erp_app_pro_current_20aff7_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='stockparity',
+            index=models.Index(fields=['resolved', '-created_at'], name='erp_app_sto_resolve_2ebf37_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='supplierevaluation',
+            index=models.Index(fields=['supplier', '-created_at'], name='erp_app_sup_supplie_4b21bf_idx'),
+        ),
+    ]
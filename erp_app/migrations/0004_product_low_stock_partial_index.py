@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-15 21:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('erp_app', '0003_add_query_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('current_stock__lte', models.F('reorder_level'))), fields=['current_stock'], name='product_low_stock_idx'),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 4.2.7 on 2026-10-15 21:36
+
+from django.db import migrations, models
+
+
+def populate_priority_level(apps, schema_editor):
+    Notification = apps.get_model('erp_app', 'Notification')
+    levels = {'LOW': 0, 'MEDIUM': 1, 'HIGH': 2, 'URGENT': 3}
+    for priority, level in levels.items():
+        Notification.objects.filter(priority=priority).update(priority_level=level)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('erp_app', '0004_product_low_stock_partial_index'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='notification',
+            options={'ordering': ['-created_at', '-priority_level']},
+        ),
+        migrations.RemoveIndex(
+            model_name='notification',
+            name='erp_app_not_is_read_51a76e_idx',
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='priority_level',
+            field=models.PositiveSmallIntegerField(choices=[(0, 'Low'), (1, 'Medium'), (2, 'High'), (3, 'Urgent')], db_index=True, default=1, editable=False),
+        ),
+        migrations.RunPython(populate_priority_level, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['-created_at', '-priority_level'], name='erp_app_not_created_24a67d_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(condition=models.Q(('is_read', False)), fields=['is_read', '-created_at'], name='unread_notif_idx'),
+        ),
+    ]
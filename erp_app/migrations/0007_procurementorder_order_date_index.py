@@ -0,0 +1,19 @@
+# Generated by Django 4.2.7 on 2026-10-15 21:41
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('erp_app', '0006_trigram_search_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='procurementorder',
+            name='order_date',
+            field=models.DateTimeField(db_index=True, default=django.utils.timezone.now),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-15 21:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('erp_app', '0007_procurementorder_order_date_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['category'], include=('current_stock', 'unit_price'), name='product_category_value_idx'),
+        ),
+    ]
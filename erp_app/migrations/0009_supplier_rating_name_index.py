@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-15 21:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('erp_app', '0008_product_category_value_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='supplier',
+            index=models.Index(fields=['-rating', 'name'], name='supplier_rating_name_idx'),
+        ),
+    ]
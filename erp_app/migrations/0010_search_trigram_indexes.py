@@ -0,0 +1,23 @@
+# Generated by Django 4.2.7 on 2026-10-15 21:42
+
+import django.contrib.postgres.indexes
+from django.db import migrations
+import django.db.models.functions.text
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('erp_app', '0009_supplier_rating_name_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='procurementorder',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('order_number'), name='gin_trgm_ops'), name='order_number_trgm'),
+        ),
+        migrations.AddIndex(
+            model_name='supplier',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('email'), name='gin_trgm_ops'), name='supplier_email_trgm'),
+        ),
+    ]
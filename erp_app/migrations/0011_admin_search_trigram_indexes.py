@@ -0,0 +1,23 @@
+# Generated by Django 4.2.7 on 2026-10-15 21:57
+
+import django.contrib.postgres.indexes
+from django.db import migrations
+import django.db.models.functions.text
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('erp_app', '0010_search_trigram_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='notification',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('message'), name='gin_trgm_ops'), name='notification_message_trgm'),
+        ),
+        migrations.AddIndex(
+            model_name='supplier',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('contact_person'), name='gin_trgm_ops'), name='supplier_contact_trgm'),
+        ),
+    ]
@@ -1,10 +1,14 @@
 """
 ERP Application Models using OOP principles
 """
-from django.db import models
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.db import models, transaction
+from django.db.models import Case, ExpressionWrapper, F, Q, Sum, Value, When
+from django.db.models.functions import Now, Upper
 from django.contrib.auth.models import User
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.utils import timezone
+from collections import defaultdict
 from decimal import Decimal
 
 
@@ -30,6 +34,30 @@ class BaseEntity(TimestampMixin):
         return self.name
 
 
+class SupplierQuerySet(models.QuerySet):
+    """QuerySet with database-side supplier performance metrics"""
+
+    def with_performance(self):
+        """Annotate performance_score and performance_status on each supplier"""
+        return self.annotate(
+            performance_score=ExpressionWrapper(
+                (
+                    F('rating') * 20 +
+                    F('on_time_delivery_rate') * Decimal('0.3') +
+                    F('quality_score') * Decimal('0.3')
+                ) / 2,
+                output_field=models.DecimalField(max_digits=7, decimal_places=2)
+            ),
+            performance_status=Case(
+                When(performance_score__gte=80, then=Value('Excellent')),
+                When(performance_score__gte=60, then=Value('Good')),
+                When(performance_score__gte=40, then=Value('Average')),
+                default=Value('Poor'),
+                output_field=models.CharField()
+            )
+        )
+
+
 class Supplier(BaseEntity):
     """Supplier model with evaluation metrics"""
     contact_person = models.CharField(max_length=100)
@@ -56,19 +84,34 @@ class Supplier(BaseEntity):
         validators=[MinValueValidator(0.00), MaxValueValidator(100.00)]
     )
 
+    objects = SupplierQuerySet.as_manager()
+
     class Meta:
         ordering = ['-rating', 'name']
+        indexes = [
+            models.Index(fields=['-rating', 'name'], name='supplier_rating_name_idx'),
+            # Trigram index matching the UPPER(...) LIKE that icontains emits
+            GinIndex(OpClass(Upper('name'), name='gin_trgm_ops'), name='supplier_name_trgm'),
+            GinIndex(OpClass(Upper('email'), name='gin_trgm_ops'), name='supplier_email_trgm'),
+            GinIndex(OpClass(Upper('contact_person'), name='gin_trgm_ops'), name='supplier_contact_trgm'),
+        ]
 
     def calculate_performance_score(self):
         """Calculate overall performance score"""
+        annotated = getattr(self, 'performance_score', None)
+        if annotated is not None:
+            return annotated
         return (
-            self.rating * 20 + 
-            self.on_time_delivery_rate * 0.3 + 
-            self.quality_score * 0.3
+            Decimal(self.rating) * 20 + 
+            Decimal(self.on_time_delivery_rate) * Decimal('0.3') + 
+            Decimal(self.quality_score) * Decimal('0.3')
         ) / 2
 
     def get_performance_status(self):
         """Get performance status based on score"""
+        annotated = getattr(self, 'performance_status', None)
+        if annotated is not None:
+            return annotated
         score = self.calculate_performance_score()
         if score >= 80:
             return "Excellent"
@@ -107,6 +150,23 @@ class Product(BaseEntity):
 
     class Meta:
         ordering = ['name']
+        indexes = [
+            models.Index(fields=['current_stock', 'reorder_level']),
+            # Partial index covering only the rows the low stock scans return
+            models.Index(
+                fields=['current_stock'],
+                name='product_low_stock_idx',
+                condition=Q(current_stock__lte=F('reorder_level'))
+            ),
+            # Covering index so per-category stock value sums can be index-only scans
+            models.Index(
+                fields=['category'],
+                name='product_category_value_idx',
+                include=['current_stock', 'unit_price']
+            ),
+            GinIndex(OpClass(Upper('name'), name='gin_trgm_ops'), name='product_name_trgm'),
+            GinIndex(OpClass(Upper('sku'), name='gin_trgm_ops'), name='product_sku_trgm'),
+        ]
 
     def is_low_stock(self):
         """Check if stock is below reorder level"""
@@ -123,6 +183,9 @@ class Product(BaseEntity):
 
     def get_total_value(self):
         """Calculate total stock value"""
+        annotated = getattr(self, 'stock_value', None)
+        if annotated is not None:
+            return annotated
         return self.current_stock * self.unit_price
 
 
@@ -145,14 +208,71 @@ class StockTransaction(TimestampMixin):
     class Meta:
         ordering = ['-created_at']
 
-    def save(self, *args, **kwargs):
-        """Override save to update product stock"""
-        super().save(*args, **kwargs)
-        if self.transaction_type == 'IN' or self.transaction_type == 'RET':
-            self.product.current_stock += self.quantity
+    def get_stock_delta(self):
+        """Get the signed change this transaction applies to product stock"""
+        if self.transaction_type in ('IN', 'RET'):
+            return self.quantity
         elif self.transaction_type == 'OUT':
-            self.product.current_stock -= self.quantity
-        self.product.save()
+            return -self.quantity
+        return 0
+
+    @classmethod
+    def bulk_record(cls, transactions):
+        """Insert many transactions and apply their stock changes in one UPDATE"""
+        deltas = defaultdict(int)
+        for txn in transactions:
+            deltas[txn.product_id] += txn.get_stock_delta()
+        deltas = {pk: delta for pk, delta in deltas.items() if delta}
+
+        with transaction.atomic():
+            created = cls.objects.bulk_create(transactions, batch_size=1000)
+            if deltas:
+                Product.objects.filter(pk__in=deltas).update(
+                    current_stock=Case(
+                        *[When(pk=pk, then=F('current_stock') + delta) for pk, delta in deltas.items()],
+                        output_field=models.IntegerField()
+                    )
+                )
+                # Keep caller-held Product instances in step with the UPDATE
+                cached = [txn.product for txn in transactions
+                          if txn.product_id in deltas and cls.product.is_cached(txn)]
+                if cached:
+                    stock = dict(Product.objects.filter(
+                        pk__in={product.pk for product in cached}
+                    ).values_list('pk', 'current_stock'))
+                    for product in cached:
+                        product.current_stock = stock[product.pk]
+
+        from .services import DashboardService
+        transaction.on_commit(DashboardService.invalidate_dashboard_stats)
+        return created
+
+    def save(self, *args, **kwargs):
+        """Override save to update product stock with a single atomic UPDATE"""
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            delta = self.get_stock_delta()
+            if delta:
+                Product.objects.filter(pk=self.product_id).update(
+                    current_stock=F('current_stock') + delta
+                )
+                # Keep a caller-held Product instance in step with the UPDATE
+                if StockTransaction.product.is_cached(self):
+                    self.product.refresh_from_db(fields=['current_stock'])
+
+        from .services import DashboardService
+        transaction.on_commit(DashboardService.invalidate_dashboard_stats)
+
+
+class ProcurementOrderQuerySet(models.QuerySet):
+    """QuerySet with database-side procurement order filters"""
+
+    def overdue(self):
+        """Orders past their expected delivery date that are still open"""
+        return self.filter(
+            expected_delivery_date__isnull=False,
+            expected_delivery_date__lt=Now()
+        ).exclude(status__in=['RECEIVED', 'CANCELLED'])
 
 
 class ProcurementOrder(TimestampMixin):
@@ -168,46 +288,76 @@ class ProcurementOrder(TimestampMixin):
     order_number = models.CharField(max_length=50, unique=True)
     supplier = models.ForeignKey(Supplier, on_delete=models.CASCADE, related_name='orders')
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='PENDING')
-    order_date = models.DateTimeField(default=timezone.now)
+    order_date = models.DateTimeField(default=timezone.now, db_index=True)
     expected_delivery_date = models.DateTimeField(null=True, blank=True)
     actual_delivery_date = models.DateTimeField(null=True, blank=True)
     total_amount = models.DecimalField(max_digits=12, decimal_places=2, default=0.00)
     created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, related_name='created_orders')
     notes = models.TextField(blank=True)
 
+    objects = ProcurementOrderQuerySet.as_manager()
+
     class Meta:
         ordering = ['-order_date']
+        indexes = [
+            models.Index(fields=['status', 'order_date']),
+            models.Index(fields=['expected_delivery_date', 'status']),
+            GinIndex(OpClass(Upper('order_number'), name='gin_trgm_ops'), name='order_number_trgm'),
+        ]
 
     def calculate_total(self):
         """Calculate total order amount"""
-        return sum(item.subtotal() for item in self.items.all())
+        if self.pk is None:
+            return Decimal('0.00')
+        total = self.items.aggregate(
+            total=Sum(
+                F('quantity') * F('unit_price'),
+                output_field=models.DecimalField(max_digits=14, decimal_places=2)
+            )
+        )['total']
+        return total or Decimal('0.00')
 
     def save(self, *args, **kwargs):
         """Override save to update total and create notifications"""
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and not update_fields:
+            # Mirror Model.save: an empty update_fields writes nothing
+            return
+        
         is_new = self.pk is None
         old_status = None
         if not is_new:
-            try:
-                old_instance = ProcurementOrder.objects.get(pk=self.pk)
-                old_status = old_instance.status
-            except ProcurementOrder.DoesNotExist:
-                pass
+            old_status = ProcurementOrder.objects.filter(
+                pk=self.pk
+            ).values_list('status', flat=True).first()
         
         self.total_amount = self.calculate_total()
+        if update_fields:
+            # total_amount is always recomputed, so keep it in narrow updates
+            kwargs['update_fields'] = {*update_fields, 'total_amount', 'updated_at'}
         super().save(*args, **kwargs)
         
-        # Create notifications using service
-        from .services import NotificationService
+        # Create notifications using service once the order write has committed
+        from .services import DashboardService, NotificationService
+        
+        transaction.on_commit(DashboardService.invalidate_dashboard_stats)
         
         if is_new:
             # New order created - PR alert
-            NotificationService.create_procurement_alert(self, alert_type='PR')
+            transaction.on_commit(
+                lambda: NotificationService.create_procurement_alert(self, alert_type='PR')
+            )
         elif old_status and old_status != self.status:
-            # Status changed - PO alert
-            NotificationService.create_procurement_alert(self, alert_type='PO')
-            # If received, create invoice alert
-            if self.status == 'RECEIVED':
-                NotificationService.create_procurement_alert(self, alert_type='Invoice')
+            # Status changed - PO alert, plus an invoice alert once received
+            alert_types = ['PO', 'Invoice'] if self.status == 'RECEIVED' else ['PO']
+
+            def send_alerts():
+                pending = []
+                for alert_type in alert_types:
+                    NotificationService.create_procurement_alert(self, alert_type=alert_type, pending=pending)
+                NotificationService.flush(pending)
+
+            transaction.on_commit(send_alerts)
 
     def is_overdue(self):
         """Check if order is overdue"""
@@ -229,6 +379,9 @@ class ProcurementOrderItem(models.Model):
 
     def subtotal(self):
         """Calculate line item subtotal"""
+        annotated = getattr(self, 'line_total', None)
+        if annotated is not None:
+            return annotated
         return self.quantity * self.unit_price
 
     def is_fully_received(self):
@@ -256,17 +409,43 @@ class Notification(TimestampMixin):
         ('URGENT', 'Urgent'),
     ]
 
+    # Numeric priority so ordering follows urgency rather than the label text
+    PRIORITY_LEVELS = [(level, label) for level, (_, label) in enumerate(PRIORITY_CHOICES)]
+    PRIORITY_LEVEL_MAP = {code: level for level, (code, _) in enumerate(PRIORITY_CHOICES)}
+
     title = models.CharField(max_length=200)
     message = models.TextField()
     notification_type = models.CharField(max_length=20, choices=NOTIFICATION_TYPES)
     priority = models.CharField(max_length=10, choices=PRIORITY_CHOICES, default='MEDIUM')
+    priority_level = models.PositiveSmallIntegerField(
+        choices=PRIORITY_LEVELS, default=1, db_index=True, editable=False
+    )
     is_read = models.BooleanField(default=False)
     user = models.ForeignKey(User, on_delete=models.CASCADE, null=True, blank=True)
     related_object_id = models.IntegerField(null=True, blank=True)
     related_object_type = models.CharField(max_length=50, blank=True)
 
     class Meta:
-        ordering = ['-created_at', '-priority']
+        ordering = ['-created_at', '-priority_level']
+        indexes = [
+            models.Index(fields=['-created_at', '-priority_level']),
+            models.Index(
+                fields=['is_read', '-created_at'],
+                name='unread_notif_idx',
+                condition=Q(is_read=False)
+            ),
+            GinIndex(OpClass(Upper('title'), name='gin_trgm_ops'), name='notification_title_trgm'),
+            GinIndex(OpClass(Upper('message'), name='gin_trgm_ops'), name='notification_message_trgm'),
+        ]
+
+    def save(self, *args, **kwargs):
+        """Keep the numeric priority level in sync with the priority label"""
+        self.sync_priority_level()
+        super().save(*args, **kwargs)
+
+    def sync_priority_level(self):
+        """Derive priority_level from the priority label"""
+        self.priority_level = self.PRIORITY_LEVEL_MAP.get(self.priority, self.PRIORITY_LEVEL_MAP['MEDIUM'])
 
     def mark_as_read(self):
         """Mark notification as read"""
@@ -288,6 +467,9 @@ class StockParity(TimestampMixin):
     class Meta:
         ordering = ['-created_at']
         verbose_name_plural = "Stock Parities"
+        indexes = [
+            models.Index(fields=['resolved', '-created_at']),
+        ]
 
     def save(self, *args, **kwargs):
         """Calculate discrepancy on save"""
@@ -316,6 +498,9 @@ class SupplierEvaluation(TimestampMixin):
     class Meta:
         ordering = ['-created_at']
         verbose_name_plural = "Supplier Evaluations"
+        indexes = [
+            models.Index(fields=['supplier', '-created_at']),
+        ]
 
     def __str__(self):
         return f"{self.supplier.name} - {self.rating}/5.0 - {self.created_at.strftime('%Y-%m-%d')}"
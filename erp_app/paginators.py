@@ -0,0 +1,23 @@
+"""
+Pagination helpers for list views
+"""
+import hashlib
+
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.utils.functional import cached_property
+
+
+class CachedCountPaginator(Paginator):
+    """Paginator that caches the COUNT(*) of its queryset for a short time"""
+    count_cache_timeout = 60
+
+    @cached_property
+    def count(self):
+        """Return the cached total number of objects, counting on a miss"""
+        query = getattr(self.object_list, 'query', None)
+        if query is None:
+            return super().count
+        digest = hashlib.md5(str(query).encode()).hexdigest()
+        cache_key = f'count:{self.object_list.model.__name__}:{digest}'
+        return cache.get_or_set(cache_key, lambda: super(CachedCountPaginator, self).count, self.count_cache_timeout)
@@ -2,16 +2,23 @@
 Business Logic Services - OOP approach
 Business rules should not be in Controllers/Views/API
 """
-from django.db.models import Q, Sum, Count, Avg, F
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import Q, Sum, Count, Avg, F, Case, When, Value, CharField, DecimalField
+from django.db.models.functions import Now
 from django.utils import timezone
 from datetime import timedelta
 from decimal import Decimal
+import time
 
 from .models import (
     Product, Supplier, ProcurementOrder, StockTransaction,
     Notification, StockParity, Category, SupplierEvaluation
 )
 
+# Report aggregates are keyed per minute, so this only bounds staleness
+REPORT_CACHE_TIMEOUT = 60
+
 
 class StockMonitoringService:
     """Service for stock monitoring business logic"""
@@ -21,7 +28,10 @@ class StockMonitoringService:
         """Get all products with low stock"""
         return Product.objects.filter(
             current_stock__lte=F('reorder_level')
-        ).select_related('category').order_by('current_stock')
+        ).select_related('category').only(
+            'id', 'name', 'sku', 'unit_price', 'unit_of_measure', 'current_stock',
+            'reorder_level', 'reorder_quantity', 'category', 'category__name'
+        ).order_by('current_stock')
     
     @staticmethod
     def get_out_of_stock_products():
@@ -31,17 +41,20 @@ class StockMonitoringService:
     @staticmethod
     def get_low_stock_suggestions():
         """Get low stock suggestions with reorder recommendations"""
-        low_stock = StockMonitoringService.get_low_stock_products()
-        suggestions = []
-        for product in low_stock:
-            suggestions.append({
-                'product': product,
-                'current_stock': product.current_stock,
-                'reorder_level': product.reorder_level,
-                'suggested_quantity': product.reorder_quantity,
-                'status': 'Out of Stock' if product.current_stock == 0 else 'Low Stock'
-            })
-        return suggestions
+        return Product.objects.filter(
+            current_stock__lte=F('reorder_level')
+        ).annotate(
+            status=Case(
+                When(current_stock=0, then=Value('Out of Stock')),
+                default=Value('Low Stock'),
+                output_field=CharField()
+            )
+        ).values(
+            'id', 'name', 'sku', 'unit_of_measure', 'current_stock',
+            'reorder_level', 'status',
+            category_name=F('category__name'),
+            suggested_quantity=F('reorder_quantity'),
+        ).order_by('current_stock')
     
     @staticmethod
     def get_stock_parity_issues():
@@ -68,11 +81,12 @@ class SupplierEvaluationService:
     @staticmethod
     def update_supplier_rating(supplier):
         """Update supplier's average rating from all evaluations"""
-        evaluations = SupplierEvaluation.objects.filter(supplier=supplier)
-        if evaluations.exists():
-            avg_rating = evaluations.aggregate(avg=Avg('rating'))['avg']
+        avg_rating = SupplierEvaluation.objects.filter(
+            supplier=supplier
+        ).aggregate(avg=Avg('rating'))['avg']
+        if avg_rating is not None:
             supplier.rating = Decimal(str(round(avg_rating, 2)))
-            supplier.save()
+            Supplier.objects.filter(pk=supplier.pk).update(rating=supplier.rating)
     
     @staticmethod
     def get_supplier_evaluations(supplier):
@@ -85,14 +99,18 @@ class SupplierEvaluationService:
     def get_supplier_performance_data(supplier):
         """Get comprehensive performance data for a supplier"""
         evaluations = SupplierEvaluationService.get_supplier_evaluations(supplier)
-        orders = ProcurementOrder.objects.filter(supplier=supplier)
+        stats = ProcurementOrder.objects.filter(supplier=supplier).aggregate(
+            total=Count('id'),
+            completed=Count('id', filter=Q(status='RECEIVED')),
+            on_time=Count('id', filter=Q(
+                status='RECEIVED',
+                actual_delivery_date__lte=F('expected_delivery_date')
+            ))
+        )
         
-        total_orders = orders.count()
-        completed_orders = orders.filter(status='RECEIVED').count()
-        on_time_orders = orders.filter(
-            status='RECEIVED',
-            actual_delivery_date__lte=F('expected_delivery_date')
-        ).count()
+        total_orders = stats['total']
+        completed_orders = stats['completed']
+        on_time_orders = stats['on_time']
         
         on_time_rate = (on_time_orders / completed_orders * 100) if completed_orders > 0 else 0
         
@@ -112,7 +130,12 @@ class ProcurementReportService:
     
     @staticmethod
     def get_procurement_summary(days=30):
-        """Get procurement summary for a date range"""
+        """Get procurement summary for a date range (cached for a minute)"""
+        cache_key = f'proc_summary:{days}:{int(time.time() // 60)}'
+        summary = cache.get(cache_key)
+        if summary is not None:
+            return summary
+        
         start_date = timezone.now() - timedelta(days=days)
         
         orders = ProcurementOrder.objects.filter(order_date__gte=start_date)
@@ -120,7 +143,7 @@ class ProcurementReportService:
         total_value = orders.aggregate(total=Sum('total_amount'))['total'] or Decimal('0.00')
         orders_by_status = orders.values('status').annotate(count=Count('id'))
         
-        return {
+        summary = {
             'total_value': total_value,
             'total_orders': orders.count(),
             'orders_by_status': list(orders_by_status),
@@ -128,44 +151,71 @@ class ProcurementReportService:
             'end_date': timezone.now(),
             'days': days
         }
+        cache.set(cache_key, summary, REPORT_CACHE_TIMEOUT)
+        return summary
     
     @staticmethod
     def get_top_suppliers_by_value(days=30, limit=10):
-        """Get top suppliers by order value"""
+        """Get top suppliers by order value (cached for a minute)"""
+        cache_key = f'proc_top_suppliers:{days}:{limit}:{int(time.time() // 60)}'
+        top_suppliers = cache.get(cache_key)
+        if top_suppliers is not None:
+            return top_suppliers
+        
         start_date = timezone.now() - timedelta(days=days)
         
-        return Supplier.objects.annotate(
-            total_order_value=Sum('orders__total_amount'),
-            order_count=Count('orders')
-        ).filter(
-            orders__order_date__gte=start_date
-        ).order_by('-total_order_value')[:limit]
+        # Rank on the orders table alone, then fetch just the winning suppliers
+        ranked = list(ProcurementOrder.objects.filter(
+            order_date__gte=start_date
+        ).values('supplier').annotate(
+            total_order_value=Sum('total_amount'),
+            order_count=Count('id'),
+            avg_order_value=Avg('total_amount')
+        ).order_by('-total_order_value')[:limit])
+        suppliers = Supplier.objects.only('name').in_bulk(
+            [row['supplier'] for row in ranked]
+        )
+        
+        top_suppliers = []
+        for row in ranked:
+            supplier = suppliers[row['supplier']]
+            supplier.total_order_value = row['total_order_value']
+            supplier.order_count = row['order_count']
+            supplier.avg_order_value = row['avg_order_value']
+            top_suppliers.append(supplier)
+        cache.set(cache_key, top_suppliers, REPORT_CACHE_TIMEOUT)
+        return top_suppliers
 
 
 class NotificationService:
     """Service for notification business logic"""
     
     @staticmethod
-    def create_notification(title, message, notification_type, priority='MEDIUM', user=None, related_object=None):
-        """Create a notification"""
-        notification = Notification.objects.create(
+    def create_notification(title, message, notification_type, priority='MEDIUM', user=None, related_object=None,
+                            pending=None):
+        """Create a notification
+        
+        When a ``pending`` list is given the unsaved notification is appended
+        to it instead, so batch workflows can write them with ``flush``.
+        """
+        notification = Notification(
             title=title,
             message=message,
             notification_type=notification_type,
             priority=priority,
-            user=user
+            user=user,
+            related_object_id=related_object.pk if related_object else None,
+            related_object_type=related_object.__class__.__name__ if related_object else ''
         )
-        
-        if related_object:
-            notification.related_object_id = related_object.pk
-            notification.related_object_type = related_object.__class__.__name__
-            notification.save()
-        
+        if pending is not None:
+            pending.append(notification)
+        else:
+            notification.save(force_insert=True)
         return notification
     
     @staticmethod
-    def create_procurement_alert(order, alert_type='PR'):
-        """Create procurement-related alert (PR/PO/Invoice)"""
+    def create_procurement_alert(order, alert_type='PR', pending=None):
+        """Create procurement-related alert (PR/PO/Invoice); see create_notification for ``pending``"""
         if alert_type == 'PR':
             title = f"Purchase Request Created: {order.order_number}"
             message = f"A new purchase request has been created for {order.supplier.name} with total amount ${order.total_amount}"
@@ -184,22 +234,108 @@ class NotificationService:
             message=message,
             notification_type=notification_type,
             priority='HIGH' if order.status == 'PENDING' else 'MEDIUM',
-            related_object=order
+            related_object=order,
+            pending=pending
         )
     
+    @staticmethod
+    def flush(pending):
+        """Write queued notifications with a single bulk INSERT"""
+        for notification in pending:
+            # bulk_create skips Notification.save, so derive the level here
+            notification.sync_priority_level()
+        created = Notification.objects.bulk_create(pending, batch_size=500)
+        pending.clear()
+        return created
+    
     @staticmethod
     def check_and_create_low_stock_alerts():
         """Check for low stock and create alerts"""
-        low_stock_products = StockMonitoringService.get_low_stock_products()
+        # Skip products that already have an unread low stock alert
+        existing_ids = Notification.objects.filter(
+            notification_type='LOW_STOCK',
+            is_read=False,
+            related_object_type='Product',
+            related_object_id__isnull=False
+        ).values('related_object_id')
+        low_stock_products = StockMonitoringService.get_low_stock_products().exclude(
+            pk__in=existing_ids
+        )
         
-        for product in low_stock_products:
-            NotificationService.create_notification(
+        notifications = [
+            Notification(
                 title=f"Low Stock Alert: {product.name}",
                 message=f"{product.name} (SKU: {product.sku}) is below reorder level. Current stock: {product.current_stock}",
                 notification_type='LOW_STOCK',
                 priority='HIGH' if product.current_stock == 0 else 'MEDIUM',
-                related_object=product
+                related_object_id=product.pk,
+                related_object_type='Product'
             )
+            for product in low_stock_products
+        ]
+        return NotificationService.flush(notifications)
+
+
+class DashboardService:
+    """Service for dashboard business logic"""
+    
+    STATS_CACHE_KEY = 'erp:dashboard:v1'
+    STATS_CACHE_TIMEOUT = 30
+    
+    @staticmethod
+    def get_dashboard_stats():
+        """Get dashboard counters, shared between concurrent page loads"""
+        return cache.get_or_set(
+            DashboardService.STATS_CACHE_KEY,
+            DashboardService.compute_dashboard_stats,
+            DashboardService.STATS_CACHE_TIMEOUT
+        )
+    
+    @staticmethod
+    def invalidate_dashboard_stats():
+        """Drop cached dashboard counters after stock or order changes"""
+        cache.delete(DashboardService.STATS_CACHE_KEY)
+    
+    @staticmethod
+    def compute_dashboard_stats():
+        """Compute dashboard counters with one aggregate per table"""
+        # Read every counter from one read-only snapshot so they agree with
+        # each other; only possible when we open the outermost transaction
+        snapshot = connection.vendor == 'postgresql' and not connection.in_atomic_block
+        with transaction.atomic():
+            if snapshot:
+                with connection.cursor() as cursor:
+                    cursor.execute('SET TRANSACTION ISOLATION LEVEL REPEATABLE READ READ ONLY')
+            
+            stock_stats = Product.objects.aggregate(
+                total=Count('id'),
+                low=Count('id', filter=Q(current_stock__lte=F('reorder_level'))),
+                out=Count('id', filter=Q(current_stock=0)),
+                value=Sum(
+                    F('current_stock') * F('unit_price'),
+                    output_field=DecimalField(max_digits=14, decimal_places=2)
+                )
+            )
+            
+            order_stats = ProcurementOrder.objects.aggregate(
+                total=Count('id'),
+                pending=Count('id', filter=Q(status='PENDING')),
+                overdue=Count('id', filter=Q(
+                    expected_delivery_date__lt=Now()
+                ) & ~Q(status__in=['RECEIVED', 'CANCELLED']))
+            )
+            
+            return {
+                'total_products': stock_stats['total'],
+                'low_stock_products': stock_stats['low'],
+                'out_of_stock': stock_stats['out'],
+                'total_stock_value': stock_stats['value'] or Decimal('0.00'),
+                'pending_orders': order_stats['pending'],
+                'overdue_orders': order_stats['overdue'],
+                'total_orders': order_stats['total'],
+                'total_suppliers': Supplier.objects.filter(is_active=True).count(),
+                'unresolved_parities': StockParity.objects.filter(resolved=False).count(),
+            }
 
 
 class ReportExportService:
@@ -219,20 +355,31 @@ class ReportExportService:
     def prepare_supplier_performance_data(supplier=None):
         """Prepare supplier performance data for export"""
         if supplier:
-            suppliers = [supplier]
+            suppliers = Supplier.objects.filter(pk=supplier.pk)
         else:
             suppliers = Supplier.objects.filter(is_active=True).order_by('-rating')
         
+        # Order counts and performance for every supplier come from one grouped query
+        suppliers = suppliers.with_performance().annotate(
+            order_count=Count('orders'),
+            completed_order_count=Count('orders', filter=Q(orders__status='RECEIVED')),
+            on_time_order_count=Count('orders', filter=Q(
+                orders__status='RECEIVED',
+                orders__actual_delivery_date__lte=F('orders__expected_delivery_date')
+            ))
+        )
+        
         data = []
-        for s in suppliers:
-            performance = SupplierEvaluationService.get_supplier_performance_data(s)
+        for s in suppliers.iterator(chunk_size=500):
+            completed_orders = s.completed_order_count
+            on_time_rate = (s.on_time_order_count / completed_orders * 100) if completed_orders > 0 else 0
             data.append({
                 'supplier': s,
                 'rating': s.rating,
-                'total_orders': performance['total_orders'],
-                'on_time_rate': performance['on_time_rate'],
+                'total_orders': s.order_count,
+                'on_time_rate': round(on_time_rate, 2),
                 'quality_score': s.quality_score,
-                'performance_status': performance['performance_status']
+                'performance_status': s.performance_status
             })
         
         return {
@@ -260,16 +407,14 @@ class ReportExportService:
         """Prepare dashboard data for export"""
         low_stock = StockMonitoringService.get_low_stock_products()
         pending_orders = ProcurementOrder.objects.filter(status='PENDING')
-        overdue_orders = [o for o in ProcurementOrder.objects.exclude(
-            status__in=['RECEIVED', 'CANCELLED']
-        ) if o.is_overdue()]
+        overdue_orders = ProcurementOrder.objects.overdue()
         
         return {
             'title': 'Dashboard Report',
             'generated_at': timezone.now(),
             'low_stock_count': low_stock.count(),
             'pending_requests': pending_orders.count(),
-            'overdue_orders': len(overdue_orders),
+            'overdue_orders': overdue_orders.count(),
             'low_stock_items': list(low_stock[:20]),
             'pending_orders': list(pending_orders[:20])
         }
@@ -2,25 +2,32 @@
 ERP Application Views using Class-Based Views (OOP)
 """
 from django.views.generic import ListView, DetailView, CreateView, UpdateView, TemplateView
+from django.contrib.auth.decorators import login_required, user_passes_test
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib.auth.views import LoginView, LogoutView
 from django.contrib.auth import login
 from django.contrib.auth.forms import UserCreationForm
+from django.http import Http404
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
-from django.db.models import Q, Sum, Count, Avg, F
+from django.core.cache import cache
+from django.db.models import Q, Sum, Count, Avg, F, ExpressionWrapper, DecimalField, OuterRef, Subquery
+from django.db.models.functions import Coalesce, TruncDate
 from django.utils import timezone
+from django.utils.decorators import method_decorator
 from datetime import timedelta
 from decimal import Decimal
 
 from .models import (
-    Product, Supplier, ProcurementOrder, StockTransaction,
+    Product, Supplier, ProcurementOrder, ProcurementOrderItem, StockTransaction,
     Notification, StockParity, Category, SupplierEvaluation
 )
 from .forms import SupplierEvaluationForm
+from .paginators import CachedCountPaginator
 from .services import (
     StockMonitoringService, SupplierEvaluationService,
-    ProcurementReportService, NotificationService, ReportExportService
+    ProcurementReportService, NotificationService, ReportExportService,
+    DashboardService
 )
 
 
@@ -31,23 +38,10 @@ class DashboardView(LoginRequiredMixin, TemplateView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         
-        # Stock Statistics
-        total_products = Product.objects.count()
-        low_stock_products = Product.objects.filter(
-            current_stock__lte=F('reorder_level')
-        ).count()
-        out_of_stock = Product.objects.filter(current_stock=0).count()
-        total_stock_value = sum(p.get_total_value() for p in Product.objects.all())
-        
-        # Procurement Statistics
-        pending_orders = ProcurementOrder.objects.filter(status='PENDING').count()
-        overdue_orders = sum(1 for order in ProcurementOrder.objects.exclude(
-            status__in=['RECEIVED', 'CANCELLED']
-        ) if order.is_overdue())
-        total_orders = ProcurementOrder.objects.count()
+        # Counters are cached briefly and invalidated on stock/order writes
+        context.update(DashboardService.get_dashboard_stats())
         
         # Supplier Statistics
-        total_suppliers = Supplier.objects.filter(is_active=True).count()
         top_suppliers = Supplier.objects.filter(is_active=True).order_by('-rating')[:5]
         
         # Recent Notifications
@@ -58,22 +52,10 @@ class DashboardView(LoginRequiredMixin, TemplateView):
         # Recent Stock Transactions
         recent_transactions = StockTransaction.objects.select_related('product').order_by('-created_at')[:10]
         
-        # Stock Parity Issues
-        unresolved_parities = StockParity.objects.filter(resolved=False).count()
-        
         context.update({
-            'total_products': total_products,
-            'low_stock_products': low_stock_products,
-            'out_of_stock': out_of_stock,
-            'total_stock_value': total_stock_value,
-            'pending_orders': pending_orders,
-            'overdue_orders': overdue_orders,
-            'total_orders': total_orders,
-            'total_suppliers': total_suppliers,
             'top_suppliers': top_suppliers,
             'recent_notifications': recent_notifications,
             'recent_transactions': recent_transactions,
-            'unresolved_parities': unresolved_parities,
         })
         return context
 
@@ -84,9 +66,18 @@ class StockListView(LoginRequiredMixin, ListView):
     template_name = 'erp_app/stock_list.html'
     context_object_name = 'products'
     paginate_by = 20
+    paginator_class = CachedCountPaginator
 
     def get_queryset(self):
-        queryset = Product.objects.select_related('category').all()
+        queryset = Product.objects.select_related('category').only(
+            'name', 'sku', 'current_stock', 'reorder_level', 'unit_price',
+            'unit_of_measure', 'category', 'category__name'
+        ).annotate(
+            stock_value=ExpressionWrapper(
+                F('current_stock') * F('unit_price'),
+                output_field=DecimalField(max_digits=14, decimal_places=2)
+            )
+        )
         search = self.request.GET.get('search')
         status = self.request.GET.get('status')
         
@@ -115,9 +106,12 @@ class StockDetailView(LoginRequiredMixin, DetailView):
     template_name = 'erp_app/stock_detail.html'
     context_object_name = 'product'
 
+    def get_queryset(self):
+        return Product.objects.select_related('category')
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['transactions'] = self.object.transactions.all()[:20]
+        context['transactions'] = self.object.transactions.select_related('user')[:20]
         context['parities'] = self.object.parities.filter(resolved=False)
         return context
 
@@ -147,9 +141,13 @@ class SupplierListView(LoginRequiredMixin, ListView):
     template_name = 'erp_app/supplier_list.html'
     context_object_name = 'suppliers'
     paginate_by = 20
+    paginator_class = CachedCountPaginator
 
     def get_queryset(self):
-        queryset = Supplier.objects.all()
+        queryset = Supplier.objects.only(
+            'name', 'contact_person', 'email', 'phone', 'rating',
+            'total_orders', 'on_time_delivery_rate', 'quality_score'
+        ).with_performance()
         search = self.request.GET.get('search')
         
         if search:
@@ -171,6 +169,9 @@ class SupplierDetailView(LoginRequiredMixin, DetailView):
     template_name = 'erp_app/supplier_detail.html'
     context_object_name = 'supplier'
 
+    def get_queryset(self):
+        return Supplier.objects.with_performance()
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['orders'] = self.object.orders.all()[:20]
@@ -185,9 +186,18 @@ class ProcurementOrderListView(LoginRequiredMixin, ListView):
     template_name = 'erp_app/procurement_list.html'
     context_object_name = 'orders'
     paginate_by = 20
+    paginator_class = CachedCountPaginator
 
     def get_queryset(self):
-        queryset = ProcurementOrder.objects.select_related('supplier', 'created_by').all()
+        # Correlated count rather than Count('items'): it is not an aggregate, so
+        # the paginator's COUNT(*) drops it instead of grouping orders x items
+        item_counts = ProcurementOrderItem.objects.filter(
+            order=OuterRef('pk')
+        ).order_by().values('order').annotate(count=Count('*')).values('count')
+        queryset = ProcurementOrder.objects.select_related('supplier').only(
+            'order_number', 'status', 'order_date', 'expected_delivery_date',
+            'total_amount', 'supplier', 'supplier__name'
+        ).annotate(item_count=Coalesce(Subquery(item_counts), 0))
         status = self.request.GET.get('status')
         search = self.request.GET.get('search')
         
@@ -195,8 +205,13 @@ class ProcurementOrderListView(LoginRequiredMixin, ListView):
             queryset = queryset.filter(status=status)
         
         if search:
+            # Resolve supplier matches first: an OR across the join can't use
+            # either trigram index, while order_number OR supplier_id IN (...) can
+            supplier_ids = list(
+                Supplier.objects.filter(name__icontains=search).values_list('pk', flat=True)
+            )
             queryset = queryset.filter(
-                Q(order_number__icontains=search) | Q(supplier__name__icontains=search)
+                Q(order_number__icontains=search) | Q(supplier_id__in=supplier_ids)
             )
         
         return queryset.order_by('-order_date')
@@ -214,9 +229,17 @@ class ProcurementOrderDetailView(LoginRequiredMixin, DetailView):
     template_name = 'erp_app/procurement_detail.html'
     context_object_name = 'order'
 
+    def get_queryset(self):
+        return ProcurementOrder.objects.select_related('supplier', 'created_by')
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['items'] = self.object.items.select_related('product').all()
+        context['items'] = self.object.items.select_related('product').annotate(
+            line_total=ExpressionWrapper(
+                F('quantity') * F('unit_price'),
+                output_field=DecimalField(max_digits=14, decimal_places=2)
+            )
+        )
         context['is_overdue'] = self.object.is_overdue()
         return context
 
@@ -232,29 +255,26 @@ class ProcurementReportView(LoginRequiredMixin, TemplateView):
         days = int(self.request.GET.get('days', 30))
         start_date = timezone.now() - timedelta(days=days)
         
-        # Orders by status
-        orders_by_status = ProcurementOrder.objects.filter(
-            order_date__gte=start_date
-        ).values('status').annotate(count=Count('id'))
+        orders = ProcurementOrder.objects.filter(order_date__gte=start_date)
         
-        # Total procurement value
-        total_value = ProcurementOrder.objects.filter(
-            order_date__gte=start_date
-        ).aggregate(total=Sum('total_amount'))['total'] or Decimal('0.00')
+        # Total procurement value and orders by status in a single scan
+        status_codes = [code for code, label in ProcurementOrder.STATUS_CHOICES]
+        totals = orders.aggregate(
+            total=Sum('total_amount'),
+            **{code: Count('id', filter=Q(status=code)) for code in status_codes}
+        )
+        total_value = totals['total'] or Decimal('0.00')
+        orders_by_status = [
+            {'status': code, 'count': totals[code]}
+            for code in status_codes if totals[code]
+        ]
         
         # Top suppliers by order value
-        top_suppliers = Supplier.objects.annotate(
-            total_order_value=Sum('orders__total_amount'),
-            order_count=Count('orders')
-        ).filter(
-            orders__order_date__gte=start_date
-        ).order_by('-total_order_value')[:10]
+        top_suppliers = ProcurementReportService.get_top_suppliers_by_value(days, limit=10)
         
         # Orders over time
-        orders_over_time = ProcurementOrder.objects.filter(
-            order_date__gte=start_date
-        ).extra(
-            select={'day': 'date(order_date)'}
+        orders_over_time = orders.annotate(
+            day=TruncDate('order_date')
         ).values('day').annotate(
             count=Count('id'),
             total=Sum('total_amount')
@@ -286,7 +306,11 @@ class NotificationListView(LoginRequiredMixin, ListView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['read'] = self.request.GET.get('read', 'false')
-        context['unread_count'] = Notification.objects.filter(is_read=False).count()
+        if context['read'] != 'true':
+            # The list already holds exactly the unread notifications
+            context['unread_count'] = context['paginator'].count
+        else:
+            context['unread_count'] = Notification.objects.filter(is_read=False).count()
         return context
 
 
@@ -298,22 +322,29 @@ class ReportsDashboardView(LoginRequiredMixin, TemplateView):
         context = super().get_context_data(**kwargs)
         
         # Stock Analytics
+        # Count('*') rather than Count('id') so product_category_value_idx
+        # covers every column read and the scan can stay index-only
         stock_by_category = Product.objects.values(
             'category__name'
         ).annotate(
-            total_items=Count('id'),
+            total_items=Count('*'),
             total_value=Sum(F('current_stock') * F('unit_price'))
         )
         
-        # Supplier Performance
-        supplier_performance = Supplier.objects.annotate(
+        # Supplier Performance (only the columns the table shows, which also
+        # keeps the GROUP BY narrow on backends that group by every column)
+        supplier_performance = Supplier.objects.filter(is_active=True).only(
+            'name', 'rating', 'on_time_delivery_rate', 'quality_score'
+        ).annotate(
             avg_order_value=Avg('orders__total_amount'),
             order_count=Count('orders')
-        ).filter(is_active=True).order_by('-rating')[:10]
+        ).order_by('-rating')[:10]
         
         # Low Stock Items
         low_stock_items = Product.objects.filter(
             current_stock__lte=F('reorder_level')
+        ).only(
+            'name', 'sku', 'current_stock', 'reorder_level'
         ).order_by('current_stock')[:20]
         
         # Recent Activity
@@ -331,12 +362,24 @@ class ReportsDashboardView(LoginRequiredMixin, TemplateView):
 # Helper views for actions
 def mark_notification_read(request, pk):
     """Mark notification as read"""
-    notification = get_object_or_404(Notification, pk=pk)
-    notification.mark_as_read()
+    updated = Notification.objects.filter(pk=pk).update(is_read=True, updated_at=timezone.now())
+    if not updated:
+        raise Http404('No Notification matches the given query.')
     messages.success(request, 'Notification marked as read.')
     return redirect('notification_list')
 
 
+@login_required
+def mark_all_notifications_read(request):
+    """Mark every unread notification shown in the notification list as read"""
+    if request.method == 'POST':
+        updated = Notification.objects.filter(is_read=False).update(
+            is_read=True, updated_at=timezone.now()
+        )
+        messages.success(request, f'{updated} notification(s) marked as read.')
+    return redirect('notification_list')
+
+
 def resolve_parity(request, pk):
     """Resolve stock parity issue"""
     parity = get_object_or_404(StockParity, pk=pk)
@@ -363,17 +406,16 @@ class CustomLogoutView(LogoutView):
     pass
 
 
+@method_decorator(
+    user_passes_test(lambda u: not u.is_authenticated, login_url='dashboard', redirect_field_name=None),
+    name='dispatch'
+)
 class RegisterView(CreateView):
     """User Registration View"""
     form_class = UserCreationForm
     template_name = 'erp_app/register.html'
     success_url = '/'
 
-    def dispatch(self, request, *args, **kwargs):
-        if request.user.is_authenticated:
-            return redirect('dashboard')
-        return super().dispatch(request, *args, **kwargs)
-
     def form_valid(self, form):
         response = super().form_valid(form)
         login(self.request, self.object)
@@ -388,7 +430,6 @@ class LowStockDashboardView(LoginRequiredMixin, TemplateView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['low_stock_products'] = StockMonitoringService.get_low_stock_products()
         context['low_stock_suggestions'] = StockMonitoringService.get_low_stock_suggestions()
         context['out_of_stock_products'] = StockMonitoringService.get_out_of_stock_products()
         return context
@@ -437,50 +478,70 @@ class SupplierEvaluationsView(LoginRequiredMixin, DetailView):
 
 
 # Export Views (JSON endpoints for jsPDF)
-class ExportLowStockView(LoginRequiredMixin, TemplateView):
+class CachedExportMixin:
+    """Memoize export payloads briefly so repeated downloads reuse them"""
+    export_cache_timeout = 120
+
+    def get_cached_export(self, name, build, *params):
+        cache_key = ':'.join(['export', name, str(self.request.user.pk), *map(str, params)])
+        return cache.get_or_set(cache_key, build, self.export_cache_timeout)
+
+
+class ExportLowStockView(LoginRequiredMixin, CachedExportMixin, TemplateView):
     """Export Low Stock Data as JSON for PDF generation"""
     template_name = 'erp_app/export_low_stock.html'
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['export_data'] = ReportExportService.prepare_low_stock_data()
+        context['export_data'] = self.get_cached_export(
+            'low_stock', ReportExportService.prepare_low_stock_data
+        )
         return context
 
 
-class ExportSupplierPerformanceView(LoginRequiredMixin, TemplateView):
+class ExportSupplierPerformanceView(LoginRequiredMixin, CachedExportMixin, TemplateView):
     """Export Supplier Performance Data as JSON for PDF generation"""
     template_name = 'erp_app/export_supplier_performance.html'
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         supplier_id = self.request.GET.get('supplier_id')
-        supplier = None
-        if supplier_id:
-            try:
-                supplier = Supplier.objects.get(pk=supplier_id)
-            except Supplier.DoesNotExist:
-                pass
-        context['export_data'] = ReportExportService.prepare_supplier_performance_data(supplier)
+
+        def build():
+            supplier = None
+            if supplier_id:
+                try:
+                    supplier = Supplier.objects.get(pk=supplier_id)
+                except Supplier.DoesNotExist:
+                    pass
+            return ReportExportService.prepare_supplier_performance_data(supplier)
+
+        context['export_data'] = self.get_cached_export('supplier_performance', build, supplier_id or '')
         return context
 
 
-class ExportProcurementReportView(LoginRequiredMixin, TemplateView):
+class ExportProcurementReportView(LoginRequiredMixin, CachedExportMixin, TemplateView):
     """Export Procurement Report Data as JSON for PDF generation"""
     template_name = 'erp_app/export_procurement_report.html'
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         days = int(self.request.GET.get('days', 30))
-        context['export_data'] = ReportExportService.prepare_procurement_report_data(days)
+        context['export_data'] = self.get_cached_export(
+            'procurement_report',
+            lambda: ReportExportService.prepare_procurement_report_data(days),
+            days
+        )
         return context
 
 
-class ExportDashboardView(LoginRequiredMixin, TemplateView):
+class ExportDashboardView(LoginRequiredMixin, CachedExportMixin, TemplateView):
     """Export Dashboard Data as JSON for PDF generation"""
     template_name = 'erp_app/export_dashboard.html'
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['export_data'] = ReportExportService.prepare_dashboard_data()
+        context['export_data'] = self.get_cached_export(
+            'dashboard', ReportExportService.prepare_dashboard_data
+        )
         return context
-